@@ -0,0 +1,37 @@
+# --- Python Code (_kernels_aot.py) ---
+# Ahead-of-time build of the serial backtest kernels
+# Key focus: Shipping precompiled machine code so a run never waits on the JIT
+#
+# Build with:  python python/_kernels_aot.py
+# This writes the backtest_kernels extension module next to this file; backtest.py
+# imports it when present and falls back to the JIT kernels in kernels.py otherwise.
+# The module records kernels.aot_fingerprint() at build time.  After an edit to
+# rolling_mean, backtest_kernel or MA_WINDOW it no longer matches, and backtest.py
+# ignores the module (with a warning) until it is rebuilt.
+# The parallel=True kernels cannot be compiled ahead of time and always use the JIT.
+import os
+
+from numba.pycc import CC
+
+import kernels
+
+cc = CC('backtest_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Compile the same Python source as the JIT kernels (specialized for kernels.MA_WINDOW),
+# for C-contiguous float32 price arrays.  pycc always uses Numba's default
+# error_model='python', which backtest_kernel does not rely on: its only data-dependent
+# division is an array expression, and those follow IEEE 754 under either model.
+cc.export('rolling_mean', 'void(f4[::1], f4[::1])')(kernels.rolling_mean.py_func)
+cc.export('backtest_kernel', 'Tuple((f4[::1], f8, f8, f8))(f4[::1], f4[::1])')(kernels.backtest_kernel.py_func)
+
+# Exported so backtest.py can check that the build matches the current kernels.py.
+_FINGERPRINT = kernels.aot_fingerprint()
+
+def fingerprint():
+    return _FINGERPRINT
+
+cc.export('fingerprint', 'i8()')(fingerprint)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -3,30 +3,173 @@
 # Key focus: Data manipulation, feature engineering, and overall backtest control
 import pandas as pd
 import numpy as np
-import rpy2.robjects as robjects
-from rpy2.robjects.packages import importr
-from rpy2.robjects import pandas2ri
-import matlab.engine
+import atexit
+import functools
 import subprocess
 import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kernels import (MA_WINDOW, aot_fingerprint, column_summary, correlation_matrix,
+                     linear_regression, simulate, window_sums)
+try:
+    # Ahead-of-time compiled versions of the serial kernels (for MA_WINDOW), built by
+    # _kernels_aot.py.
+    import backtest_kernels
+except ImportError:
+    backtest_kernels = None
+if backtest_kernels is not None and (not hasattr(backtest_kernels, 'fingerprint')
+                                     or backtest_kernels.fingerprint() != aot_fingerprint()):
+    print("Warning: backtest_kernels is out of date with kernels.py; using the JIT kernels. "
+          "Rebuild it with _kernels_aot.py.")
+    backtest_kernels = None
+if backtest_kernels is not None:
+    from backtest_kernels import backtest_kernel, rolling_mean
+else:
+    from kernels import backtest_kernel, rolling_mean
+
+# R and MATLAB are only needed to run the original scripts (main(external=True)).
+try:
+    import rpy2.robjects as robjects
+    from rpy2.robjects.packages import importr
+    from rpy2.robjects import pandas2ri
+except ImportError:
+    robjects = None
+
+# Set by _activate_r once pandas2ri's conversion rules are registered.
+_R_ACTIVATED = False
+
+def _activate_r():
+    """
+    Enables Pandas to R conversion on first use.  pandas2ri.activate() registers global
+    rpy2 conversion rules, so it is done once per process, and only when R is used.
+    """
+    global _R_ACTIVATED
+    if not _R_ACTIVATED:
+        pandas2ri.activate()  # Enable Pandas to R conversion
+        _R_ACTIVATED = True
+
+try:
+    import matlab.engine
+except ImportError:
+    matlab = None
+
+# Optional fast-path readers.  load_data falls back to pandas when they are missing.
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = None
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Block size handed to the PyArrow CSV reader; each block is tokenized on its own thread.
+CSV_BLOCK_SIZE = 64 << 20
+
+def _cache_path(file_path):
+    """Returns the path of the Feather cache kept next to a CSV file."""
+    return f"{file_path}.feather"
+
+def _schema_path(file_path):
+    """Returns the path of the Arrow schema saved next to a CSV file."""
+    return f"{file_path}.schema"
+
+def _load_schema(file_path):
+    """Returns the Arrow schema saved by an earlier parse of file_path, or None."""
+    try:
+        with open(_schema_path(file_path), 'rb') as f:
+            return pa.ipc.read_schema(pa.py_buffer(f.read()))
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+def _save_schema(file_path, schema):
+    """Saves the Arrow schema of a parsed CSV file so later parses can skip type inference."""
+    try:
+        with open(_schema_path(file_path), 'wb') as f:
+            f.write(schema.serialize().to_pybytes())
+    except OSError as e:
+        print(f"Warning: Could not write schema {_schema_path(file_path)}: {e}")
 
-def load_data(file_path, file_type="csv"):
+def _read_csv(file_path, engine, columns=None, cache_schema=False):
+    """
+    Parses a CSV file with the requested engine, falling back to Pandas.
+
+    With cache_schema, the PyArrow reader takes its column types from the schema saved by
+    the previous parse (and saves one if there is none), so type inference is skipped.
+    """
+    if engine == "polars" and pl is not None and pa is not None:
+        # Polars parses on all cores by default; to_pandas goes through Arrow.
+        return pl.read_csv(file_path, columns=columns).to_pandas()
+    if engine in ("pyarrow", "polars") and pa is not None:
+        read_options = pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True)
+        schema = _load_schema(file_path) if cache_schema else None
+        try:
+            convert_options = pa_csv.ConvertOptions(include_columns=columns, column_types=schema)
+            table = pa_csv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
+        except pa.ArrowInvalid:
+            if schema is None:
+                raise
+            # The file's columns no longer match the saved types; infer them again.
+            schema = None
+            convert_options = pa_csv.ConvertOptions(include_columns=columns)
+            table = pa_csv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
+        if cache_schema and schema is None:
+            _save_schema(file_path, table.schema)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    return pd.read_csv(file_path, usecols=columns)
+
+def load_data(file_path, file_type="csv", engine="pyarrow", columns=None, use_cache=True):
     """
     Loads data from a CSV or Parquet file into a Pandas DataFrame.
 
+    Parsing is done by PyArrow's multithreaded reader (or Polars, if requested) and the
+    result is converted to Pandas only at the end.  If the requested engine is not
+    installed, the plain Pandas readers are used instead.
+
+    A parsed CSV is also written to a ZSTD-compressed Feather file next to it
+    (``<file_path>.feather``).  Later loads read the memory-mapped cache instead of
+    re-parsing, as long as the cache is not older than the CSV.  The Arrow schema of the
+    parse is kept as well (``<file_path>.schema``), so re-parsing a changed CSV skips
+    type inference.
+
     Args:
         file_path (str): Path to the data file.
         file_type (str, optional): Type of file ("csv" or "parquet"). Defaults to "csv".
+        engine (str, optional): Reader to use ("pyarrow", "polars" or "pandas"). Defaults to "pyarrow".
+        columns (list, optional): Only read these columns. Defaults to None (all columns).
+        use_cache (bool, optional): Read and write the Feather cache for CSV files. Defaults to True.
 
     Returns:
         pd.DataFrame: The loaded data.  Returns None on error, prints error.
     """
     try:
         if file_type == "csv":
-            return pd.read_csv(file_path)
+            use_cache = use_cache and pa is not None
+            cache_path = _cache_path(file_path)
+            if use_cache and os.path.exists(cache_path) \
+                    and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+                table = pa_feather.read_table(cache_path, columns=columns, memory_map=True)
+                return table.to_pandas(zero_copy_only=False)
+            if not use_cache:
+                return _read_csv(file_path, engine, columns)
+            # Parse every column so the cache can serve any later column selection.
+            df = _read_csv(file_path, engine, cache_schema=True)
+            try:
+                df.to_feather(cache_path, compression="zstd")
+            except Exception as e:
+                print(f"Warning: Could not write cache {cache_path}: {e}")
+            return df if columns is None else df[columns]
         elif file_type == "parquet":
-            return pd.read_parquet(file_path)
+            if engine != "pandas" and pa is not None:
+                table = pa_parquet.read_table(file_path, columns=columns, use_threads=True, pre_buffer=True)
+                return table.to_pandas(split_blocks=True, self_destruct=True)
+            return pd.read_parquet(file_path, columns=columns)
         else:
             print(f"Error: Unsupported file type: {file_type}")
             return None
@@ -37,13 +180,175 @@ def load_data(file_path, file_type="csv"):
         print(f"Error loading data: {e}")
         return None
 
-def preprocess_data(df):
+def _iter_csv_batches(file_path, columns=None, column_types=None, queue_size=4):
+    """
+    Yields a CSV file as PyArrow record batches, one per parsed block.
+
+    The blocks are parsed on a background thread and handed over through a bounded
+    queue, so the caller can work on one block while the following ones are read.
+    column_types (a schema or None) is passed to the reader as is; without it, types are
+    inferred from the first block.
+    """
+    batches = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            read_options = pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True)
+            convert_options = pa_csv.ConvertOptions(include_columns=columns, column_types=column_types)
+            with pa_csv.open_csv(file_path, read_options=read_options,
+                                 convert_options=convert_options) as reader:
+                for batch in reader:
+                    if stop.is_set():
+                        break
+                    batches.put(batch)
+        except Exception as e:
+            batches.put(e)
+        finally:
+            batches.put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = batches.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Unblock the producer if the caller stopped early.
+        stop.set()
+        while producer.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+def _scan_csv_batches(file_path, columns, window, column_types=None):
+    """
+    Reads a CSV file block by block for load_and_preprocess_stream, accumulating the sums
+    and counts of its numeric columns and the moving-average window sums of Close.
+
+    Returns:
+        tuple: (record batches, numeric column names, sums, counts, window sums of Close,
+            NaN counts of those windows).
+    """
+    batches = []
+    numeric = None
+    sums = counts = None
+    tail = np.empty(0)
+    ma_sums, ma_nans = [], []
+    for batch in _iter_csv_batches(file_path, columns, column_types):
+        if numeric is None:
+            numeric = [name for name, dtype in zip(batch.schema.names, batch.schema.types)
+                       if pa.types.is_integer(dtype) or pa.types.is_floating(dtype)]
+            sums = np.zeros(len(numeric))
+            counts = np.zeros(len(numeric), dtype=np.int64)
+        for j, name in enumerate(numeric):
+            values = batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+            present = ~np.isnan(values)
+            sums[j] += values[present].sum()
+            counts[j] += present.sum()
+        # Carry the last window - 1 samples over so windows can span two blocks.
+        close = np.concatenate((tail, batch.column('Close').to_numpy(zero_copy_only=False)))
+        block_sums = np.empty_like(close)
+        block_nans = np.empty_like(close)
+        window_sums(close, window, block_sums, block_nans)
+        ma_sums.append(block_sums[len(tail):])
+        ma_nans.append(block_nans[len(tail):])
+        tail = close[len(close) - min(len(close), window - 1):]
+        batches.append(batch)
+    return batches, numeric, sums, counts, ma_sums, ma_nans
+
+def load_and_preprocess_stream(file_path, columns=None, window=MA_WINDOW):
+    """
+    Loads and preprocesses a large CSV file block by block.
+
+    Gives the same result as preprocess_data(load_data(file_path)), but the statistics for
+    the mean fill and the moving-average window sums of Close are accumulated on each
+    block as soon as it is parsed, while later blocks are still being read.  Only the
+    fill itself, and folding the Close mean into the window sums, wait for the end of
+    the file.  The Feather cache is not used, unless a later block does not fit the
+    column types taken from the saved schema or the first block; then the whole file is
+    loaded with load_data and preprocessed with preprocess_data instead.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        columns (list, optional): Only read these columns. Defaults to None (all columns).
+        window (int, optional): Moving-average window. Defaults to MA_WINDOW (5).
+
+    Returns:
+        pd.DataFrame: Preprocessed DataFrame. Returns None on error, prints error.
+    """
+    if pa is None:
+        print("Error: Streaming CSV loading requires pyarrow")
+        return None
+    try:
+        # The streaming reader infers types from the first block only, so prefer the
+        # schema saved by an earlier full parse.
+        schema = _load_schema(file_path)
+        try:
+            scan = _scan_csv_batches(file_path, columns, window, schema)
+        except pa.ArrowInvalid:
+            scan = None
+            if schema is not None:
+                # The file's columns no longer match the saved types; infer them again.
+                try:
+                    scan = _scan_csv_batches(file_path, columns, window)
+                except pa.ArrowInvalid:
+                    pass
+        if scan is None:
+            # The types inferred from the first block do not fit a later one (e.g. floats
+            # in a column that started out as integers), so parse the whole file instead.
+            # load_data also saves the schema, which later streams of the file then use.
+            df = preprocess_data(load_data(file_path, columns=columns))
+            if df is not None and window != MA_WINDOW:
+                df['MA_5'] = df['Close'].rolling(window).mean().to_numpy(dtype=np.float32)
+            return df
+        batches, numeric, sums, counts, ma_sums, ma_nans = scan
+        if not batches:
+            print(f"Error: No data in {file_path}")
+            return None
+
+        df = pa.Table.from_batches(batches).to_pandas(split_blocks=True, self_destruct=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        fill = {name: means[j] for j, name in enumerate(numeric) if counts[j] < len(df)}
+        if fill:
+            df.fillna(fill, inplace=True)
+        close_mean = means[numeric.index('Close')]
+        ma_5 = (np.concatenate(ma_sums) + np.concatenate(ma_nans) * close_mean) / window
+        df['Close'] = df['Close'].to_numpy(dtype=np.float32)
+        df['MA_5'] = ma_5.astype(np.float32)
+        return df
+    except FileNotFoundError:
+        print(f"Error: File not found at {file_path}")
+        return None
+    except Exception as e:
+        print(f"Error loading data in blocks: {e}")
+        return None
+
+def _preprocess_polars(df):
+    """Runs the preprocessing steps as one Polars lazy query."""
+    return (pl.from_pandas(df).lazy()
+            .with_columns(pl.col(pl.Float32, pl.Float64).fill_null(strategy="mean"))
+            .with_columns(pl.col('Close').cast(pl.Float32))
+            .with_columns(pl.col('Close').rolling_mean(MA_WINDOW).alias('MA_5'))
+            .collect()
+            .to_pandas())
+
+def preprocess_data(df, engine="numba"):
     """
     Preprocesses the data, handling missing values and performing initial feature engineering.
     This is a placeholder;  Add more sophisticated techniques as needed.
 
     Args:
-        df (pd.DataFrame): Input DataFrame.
+        df (pd.DataFrame): Input DataFrame.  Modified in place, except with the Polars engine.
+        engine (str, optional): "polars" runs the steps as a Polars lazy query; any other
+            value uses NumPy and the Numba kernels. Defaults to "numba".
 
     Returns:
         pd.DataFrame: Preprocessed DataFrame. Returns None on error, prints error.
@@ -51,15 +356,45 @@ def preprocess_data(df):
     if df is None:
         return None
     try:
-        # Basic example: Fill missing values with the mean
-        df_filled = df.fillna(df.mean())
+        if engine == "polars" and pl is not None:
+            return _preprocess_polars(df)
+        # Basic example: Fill missing values with the mean.  Only float columns can hold
+        # NaN, so the means are taken over those alone, in one NumPy pass, and only the
+        # columns that actually have gaps are filled (in place, without copying the frame).
+        df_filled = df
+        numeric = df_filled.select_dtypes(include=np.floating)
+        values = numeric.to_numpy()
+        has_missing = np.isnan(values).any(axis=0)
+        if has_missing.any():
+            means = np.nanmean(values[:, has_missing], axis=0)
+            df_filled.fillna(dict(zip(numeric.columns[has_missing], means)), inplace=True)
         # Simple feature engineering example: Calculate a moving average
-        df_filled['MA_5'] = df_filled['Close'].rolling(window=5).mean()
+        # Close and MA_5 are stored as float32: the strategy needs nowhere near float64
+        # precision, and half-width columns halve the bytes the backtest streams through.
+        close = np.ascontiguousarray(df_filled['Close'].to_numpy(dtype=np.float32))
+        ma_5 = np.empty_like(close)
+        rolling_mean(close, ma_5)
+        df_filled['Close'] = close
+        df_filled['MA_5'] = ma_5
         return df_filled
     except Exception as e:
         print(f"Error in preprocessing: {e}")
         return None
 
+def _to_arrow_ipc(df):
+    """Serializes a DataFrame to Arrow IPC stream bytes."""
+    batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+@functools.lru_cache(maxsize=None)
+def _source_r_script(r_script_path, mtime):
+    """Sources an R script and returns its perform_analysis function, once per path and mtime."""
+    robjects.r['source'](r_script_path)
+    return robjects.globalenv['perform_analysis']
+
 def run_r_analysis(df, r_script_path="analysis.R"):
     """
     Runs an R script for statistical analysis using rpy2.
@@ -73,12 +408,19 @@ def run_r_analysis(df, r_script_path="analysis.R"):
     """
     if df is None:
         return None
+    if robjects is None:
+        print("Error running R analysis: rpy2 is not installed")
+        return None
     try:
-        # Initialize R environment
-        robjects.r['source'](r_script_path)  # Load the R script
-        r_function = robjects.globalenv['perform_analysis']  # Get the R function
-        pandas2ri.activate()  # Enable Pandas to R conversion
-        r_df = pandas2ri.py2rpy(df)  # Convert Pandas DataFrame to R DataFrame
+        _activate_r()
+        # Load the R script (only again if it changed) and get the R function
+        r_function = _source_r_script(os.path.abspath(r_script_path), os.path.getmtime(r_script_path))
+        if pa is not None:
+            # Ship the frame as an Arrow IPC stream (one raw vector) that R reads with
+            # arrow::read_ipc_stream, instead of converting it cell by cell.
+            r_df = robjects.vectors.ByteVector(_to_arrow_ipc(df))
+        else:
+            r_df = pandas2ri.py2rpy(df)  # Convert Pandas DataFrame to R DataFrame
         r_result = r_function(r_df)  # Call the R function with the DataFrame
         # Convert the R result to a Python dictionary.  Handles nested lists.
         result_dict = dict()
@@ -92,12 +434,27 @@ def run_r_analysis(df, r_script_path="analysis.R"):
         print(f"Error running R analysis: {e}")
         return None
 
+# MATLAB engine shared by all run_matlab_simulation calls; started on first use.
+_MATLAB_ENG = None
+
+def _get_matlab_engine():
+    """Returns the shared MATLAB engine, starting it (and scheduling its shutdown) on first use."""
+    global _MATLAB_ENG
+    if _MATLAB_ENG is None:
+        _MATLAB_ENG = matlab.engine.start_matlab('-nodesktop -nojvm')
+        atexit.register(_MATLAB_ENG.quit)
+    return _MATLAB_ENG
+
 def run_matlab_simulation(df, matlab_script_path="simulation.m"):
     """
     Runs a MATLAB simulation script.  Requires a running MATLAB engine.
 
+    The engine is started once and reused by later calls.  The script's directory is
+    added to the MATLAB path and its function is called directly with the data struct.
+
     Args:
-        df (pd.DataFrame): Input DataFrame to be passed to MATLAB.  Converted to a struct.
+        df (pd.DataFrame): Input DataFrame to be passed to MATLAB.  Its numeric columns are
+            converted to a struct of column vectors.
         matlab_script_path (str): Path to the MATLAB script. Defaults to "simulation.m".
 
     Returns:
@@ -105,62 +462,155 @@ def run_matlab_simulation(df, matlab_script_path="simulation.m"):
     """
     if df is None:
         return None
+    if matlab is None:
+        print("Error running MATLAB simulation: the MATLAB Engine API is not installed")
+        return None
     try:
-        eng = matlab.engine.start_matlab()
-        # Convert Pandas DataFrame to a dictionary (MATLAB struct equivalent)
-        data_dict = df.to_dict(orient='list')
-
-        # Ensure all lists are of the same length, padding with NaNs if necessary
-        max_len = max(len(v) for v in data_dict.values())
-        for key, value in data_dict.items():
-            if len(value) < max_len:
-                data_dict[key] += [np.nan] * (max_len - len(value))
-
-        # Convert the dictionary to a MATLAB struct
+        eng = _get_matlab_engine()
+        script_dir, script_file = os.path.split(os.path.abspath(matlab_script_path))
+        eng.addpath(script_dir, nargout=0)
+        # Build the struct fields from one column-major float64 buffer: each numeric column
+        # becomes an N x 1 matlab.double copied straight from NumPy memory rather than
+        # element by element from a list.  The columns share the frame's index, so they
+        # are already the same length.
+        numeric = df.select_dtypes(include=np.number)
+        values = np.asfortranarray(numeric.to_numpy(dtype=np.float64))
         try:
-            matlab_data = eng.struct(data_dict)
+            # A dict is passed to MATLAB as a struct.
+            matlab_data = {col: matlab.double(values[:, j:j + 1]) for j, col in enumerate(numeric.columns)}
         except Exception as e:
             print(f"Error converting data to MATLAB struct: {e}")
-            eng.quit()
             return None
 
-        # Call the MATLAB function.
-        result = eng.eval(f"run('{matlab_script_path}')", nargout=1) # Capture output
+        # Call the script's function (MATLAB resolves it by file name) on the data.
+        result = eng.feval(os.path.splitext(script_file)[0], matlab_data, nargout=1) # Capture output
 
-        eng.quit()
         return result # Return the result.
     except Exception as e:
         print(f"Error running MATLAB simulation: {e}")
         return None
 
-def run_backtest(df):
+def run_analysis(df):
+    """
+    Native port of analysis.R: summary statistics, correlations and a Close ~ Volume
+    regression, computed by the Numba kernels instead of an R session.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+
+    Returns:
+        dict or None: Results with the same keys as the R script's list.  Returns None on error.
+    """
+    if df is None:
+        return None
+    try:
+        numeric = df.select_dtypes(include=np.number)
+        values = numeric.to_numpy(dtype=np.float64)
+        summary = pd.DataFrame(column_summary(values), columns=numeric.columns,
+                               index=['Min.', '1st Qu.', 'Median', 'Mean', '3rd Qu.', 'Max.'])
+        cor_matrix = pd.DataFrame(correlation_matrix(values), index=numeric.columns, columns=numeric.columns)
+        if 'Close' in df.columns and 'Volume' in df.columns:
+            coef, se, r_squared, sigma = linear_regression(
+                df['Volume'].to_numpy(dtype=np.float64), df['Close'].to_numpy(dtype=np.float64))
+            lm_summary = {
+                'coefficients': pd.DataFrame({'Estimate': coef, 'Std. Error': se, 't value': coef / se},
+                                             index=['(Intercept)', 'Volume']),
+                'sigma': sigma,
+                'r_squared': r_squared
+            }
+        else:
+            lm_summary = "Close or Volume columns not found. Skipping linear regression."
+        return {
+            'summary': summary,
+            'correlation_matrix': cor_matrix,
+            'linear_model_summary': lm_summary
+        }
+    except Exception as e:
+        print(f"Error running analysis: {e}")
+        return None
+
+def run_simulation(df, window=MA_WINDOW):
+    """
+    Native port of simulation.m, computed by the Numba kernels instead of a MATLAB engine.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame with 'Close' and 'Volume' columns.
+        window (int, optional): Moving-average window. Defaults to MA_WINDOW (5).
+
+    Returns:
+        dict or None: Results with the same fields as the MATLAB struct, or None on error.
+    """
+    if df is None:
+        return None
+    try:
+        mean_close, std_close, max_volume, signal, cumulative_return = simulate(
+            df['Close'].to_numpy(dtype=np.float64), df['Volume'].to_numpy(dtype=np.float64), window)
+        return {
+            'mean_close': mean_close,
+            'std_close': std_close,
+            'max_volume': max_volume,
+            'simulated_signal': signal,
+            'cumulative_return': cumulative_return
+        }
+    except Exception as e:
+        print(f"Error running simulation: {e}")
+        return None
+
+def _backtest_polars(df):
+    """
+    Polars lazy-query counterpart of kernels.backtest_kernel.  Like the kernel, it
+    compounds as a cumulative sum of log1p(r), with a loss of more than 100% clamped to
+    -100%, so both engines report the same returns.
+
+    Returns:
+        tuple: (cumulative returns array, total return, mean return, return variance).
+    """
+    strategy_returns = pl.col('Position').shift(1) * pl.col('Close').pct_change()
+    # Polars has no expm1, so the log growth is turned back into returns with exp() - 1.
+    log_growth = pl.col('Strategy_Returns').clip(lower_bound=-1.0).log1p().cum_sum()
+    out = (pl.from_pandas(df[['Close', 'MA_5']]).lazy()
+           .with_columns(pl.when(pl.col('MA_5') > pl.col('Close')).then(1).otherwise(-1).alias('Position'))
+           .with_columns(strategy_returns.alias('Strategy_Returns'))
+           .select((log_growth.exp() - 1).alias('cumulative_returns'),
+                   pl.col('Strategy_Returns').mean().alias('mean'),
+                   pl.col('Strategy_Returns').var().alias('var'))
+           .collect())
+    cumulative_returns = out['cumulative_returns'].to_numpy()
+    total_return = cumulative_returns[-1] if len(cumulative_returns) > 1 else np.nan
+    return cumulative_returns, total_return, out['mean'][0], out['var'][0]
+
+def run_backtest(df, engine="numba"):
     """
     Executes a simple backtesting strategy.  This is a placeholder.
 
     Args:
         df (pd.DataFrame): DataFrame with data, including potential features.
+        engine (str, optional): "polars" runs the strategy as a Polars lazy query; any
+            other value uses the fused Numba kernel. Defaults to "numba".
 
     Returns:
         dict or None: Backtesting results (e.g., returns, metrics), or None on error.
+            'cumulative_returns' is a NumPy array; call .tolist() on it if a list is needed.
     """
     if df is None:
         return None
     try:
-        # Example strategy: Buy if MA_5 > Close, sell if MA_5 < Close
-        df['Position'] = np.where(df['MA_5'] > df['Close'], 1, -1)
-        df['Lagged_Position'] = df['Position'].shift(1)
-        df['Returns'] = df['Close'].pct_change()
-        df['Strategy_Returns'] = df['Lagged_Position'] * df['Returns']
-        cumulative_returns = (df['Strategy_Returns'] + 1).cumprod() - 1
+        # Example strategy: Buy if MA_5 > Close, sell if MA_5 < Close.
+        # Positions, returns and their statistics are computed in one compiled pass.
+        if engine == "polars" and pl is not None:
+            cumulative_returns, total_return, _, return_variance = _backtest_polars(df)
+        else:
+            close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float32))
+            ma_5 = np.ascontiguousarray(df['MA_5'].to_numpy(dtype=np.float32))
+            cumulative_returns, total_return, _, return_variance = backtest_kernel(close, ma_5)
         # Basic metrics
-        total_return = cumulative_returns.iloc[-1]
         average_annual_return = (total_return + 1)**(252/len(df)) - 1 # Crude estimate
         # Volatility is often annualized
-        annualized_volatility = df['Strategy_Returns'].std() * np.sqrt(252)
+        annualized_volatility = np.sqrt(return_variance) * np.sqrt(252)
         sharpe_ratio = average_annual_return / annualized_volatility if annualized_volatility > 0 else 0
 
         results = {
-            'cumulative_returns': cumulative_returns.tolist(),
+            'cumulative_returns': cumulative_returns,
             'total_return': total_return,
             'average_annual_return': average_annual_return,
             'annualized_volatility': annualized_volatility,
@@ -171,7 +621,8 @@ def run_backtest(df):
         print(f"Error in backtesting: {e}")
         return None
 
-def main(data_file="data.csv", r_script="analysis.R", matlab_script="simulation.m", file_type="csv"):
+def main(data_file="data.csv", r_script="analysis.R", matlab_script="simulation.m", file_type="csv", engine="pyarrow",
+         columns=None, use_cache=True, external=False, stream=False):
     """
     Main function to orchestrate the backtesting process.
 
@@ -180,41 +631,72 @@ def main(data_file="data.csv", r_script="analysis.R", matlab_script="simulation.
         r_script (str): Path to the R script. Defaults to "analysis.R".
         matlab_script (str): Path to the MATLAB script. Defaults to "simulation.m".
         file_type (str): Type of file ("csv" or "parquet"). Defaults to "csv".
+        engine (str): Reader used by load_data ("pyarrow", "polars" or "pandas"). Defaults to "pyarrow".
+            "polars" also runs preprocessing and the backtest as Polars lazy queries.
+        columns (list): Columns to load. Defaults to None, since the analysis stage
+            consumes the whole frame; pass e.g. ["Close"] when only the backtest is needed.
+        use_cache (bool): Load CSV files through the Feather cache. Defaults to True.
+        external (bool): Run the analysis and simulation through R and MATLAB instead of
+            their native Numba ports. Defaults to False.
+        stream (bool): For large CSV files, parse and preprocess block by block so the two
+            overlap (see load_and_preprocess_stream). Defaults to False.
     """
     print("Starting backtesting process...")
     start_time = time.time()
 
-    # 1. Load Data (Python)
-    print(f"Loading data from {data_file}...")
-    df = load_data(data_file, file_type)
-    if df is None:
-        print("Failed to load data. Exiting.")
-        return
-
-    # 2. Preprocess Data (Python)
-    print("Preprocessing data...")
-    df_processed = preprocess_data(df)
-    if df_processed is None:
-        print("Failed to preprocess data. Exiting.")
-        return
+    if stream and file_type == "csv":
+        # 1-2. Load and Preprocess Data block by block (Python)
+        print(f"Loading and preprocessing data from {data_file} in blocks...")
+        df_processed = load_and_preprocess_stream(data_file, columns)
+        if df_processed is None:
+            print("Failed to load data. Exiting.")
+            return
+    else:
+        # 1. Load Data (Python)
+        print(f"Loading data from {data_file}...")
+        df = load_data(data_file, file_type, engine, columns, use_cache)
+        if df is None:
+            print("Failed to load data. Exiting.")
+            return
+
+        # 2. Preprocess Data (Python)
+        print("Preprocessing data...")
+        df_processed = preprocess_data(df, engine)
+        if df_processed is None:
+            print("Failed to preprocess data. Exiting.")
+            return
+
+    # 3-5. Run the analysis, simulation and backtest concurrently.  They only read
+    # df_processed, and the backtest kernel releases the GIL, so the stages overlap
+    # instead of running back to back.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        print("Running backtest in Python...")
+        backtest_future = executor.submit(run_backtest, df_processed, engine)
+        if external:
+            # MATLAB runs in its own engine process, so it can wait on a worker.  rpy2
+            # embeds R in this process, and R is not thread-safe, so the R analysis stays
+            # on the thread that initialised R.
+            print("Running MATLAB simulation...")
+            matlab_future = executor.submit(run_matlab_simulation, df_processed, matlab_script)
+            print("Running R analysis...")
+            r_results = run_r_analysis(df_processed, r_script)
+            matlab_results = matlab_future.result()
+        else:
+            # The native ports are parallel Numba kernels that already use every core, and
+            # Numba's threading layers do not all support parallel launches from several
+            # threads, so they run here while the backtest proceeds on the worker.
+            print("Running analysis...")
+            r_results = run_analysis(df_processed)
+            print("Running simulation...")
+            matlab_results = run_simulation(df_processed)
+        backtest_results = backtest_future.result()
 
-    # 3. Run R Analysis
-    print("Running R analysis...")
-    r_results = run_r_analysis(df_processed, r_script)
     if r_results is None:
-        print("Failed to run R analysis. Continuing (with potential issues).")
+        print(f"Failed to run {'R analysis' if external else 'analysis'}. Continuing (with potential issues).")
         r_results = {} # Ensure it is defined
-
-    # 4. Run MATLAB Simulation
-    print("Running MATLAB simulation...")
-    matlab_results = run_matlab_simulation(df_processed, matlab_script)
     if matlab_results is None:
-        print("Failed to run MATLAB simulation. Continuing (with potential issues).")
+        print(f"Failed to run {'MATLAB simulation' if external else 'simulation'}. Continuing (with potential issues).")
         matlab_results = {} # Ensure it is defined
-
-    # 5. Run Backtest (Python)
-    print("Running backtest in Python...")
-    backtest_results = run_backtest(df_processed)
     if backtest_results is None:
         print("Failed to run backtest. Exiting.")
         return
@@ -233,15 +715,44 @@ def main(data_file="data.csv", r_script="analysis.R", matlab_script="simulation.
     print(f"Annualized Volatility: {backtest_results.get('annualized_volatility', 'N/A'):.4f}")
     print(f"Sharpe Ratio: {backtest_results.get('sharpe_ratio', 'N/A'):.4f}")
 
-    print("\n--- R Analysis Results ---")
+    print("\n--- Analysis Results ---")
     print(r_results) # Print the whole R result dictionary
 
-    print("\n--- MATLAB Simulation Results ---")
+    print("\n--- Simulation Results ---")
     print(matlab_results) # Print the whole MATLAB result.
 
     end_time = time.time()
     print(f"Backtesting process completed in {end_time - start_time:.2f} seconds.")
 
+def _warm_up():
+    """
+    Runs the Numba stages once on tiny frames so that JIT compilation (or loading from the
+    on-disk cache) happens at import rather than inside the first timed run.
+
+    Numba compiles one specialization per argument layout and writability, so the frames
+    are built like load_data's output and go through the same functions as real data:
+    run_backtest then sees read-only float32 views, and run_analysis an F-ordered
+    array.  Volume is tried both as an integer column with no gaps and as a float
+    column with a gap, since the first is copied on conversion to float64 and the second
+    is passed as a read-only view.  The ahead-of-time kernels, when they are used, need
+    no compiling and are only called.
+    """
+    n = 2 * MA_WINDOW
+    close = np.linspace(1.0, 2.0, n)
+    close[1] = np.nan
+    for volume in (np.arange(n, dtype=np.int64), np.where(np.arange(n) == 2, np.nan, 1.0)):
+        df = pd.DataFrame({'Date': [str(i) for i in range(n)], 'Open': close.copy(),
+                           'Close': close.copy(), 'Volume': volume})
+        df = preprocess_data(df)
+        run_backtest(df)
+        run_analysis(df)
+        run_simulation(df)
+    # load_and_preprocess_stream calls window_sums on float64 arrays of its own.
+    window_sums(close, MA_WINDOW, np.empty_like(close), np.empty_like(close))
+
+# Compile (or load from cache) the JIT kernels now, so the first run does not pay for it.
+_warm_up()
+
 if __name__ == "__main__":
     # You can modify the file paths and script names here.
     # For Parquet, change data_file and set file_type="parquet"
@@ -0,0 +1,352 @@
+# --- Python Code (kernels.py) ---
+# Numba-compiled numeric kernels used by backtest.py
+# Key focus: Single-pass loops over NumPy arrays, no intermediate pandas objects
+import hashlib
+import inspect
+
+import numpy as np
+from numba import njit, prange
+
+# fastmath flags that let LLVM reorder and vectorize arithmetic.  'nnan' and 'ninf'
+# are deliberately left out: the moving-average warm-up is NaN and the kernels
+# rely on NaN comparisons behaving as IEEE 754 specifies.
+FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# Moving-average window of the example strategy; rolling_mean below is specialized for it.
+MA_WINDOW = 5
+
+def make_rolling_mean(window):
+    """
+    Builds a trailing moving-average kernel with the window length fixed at compile time.
+
+    The returned rolling_mean(x, out) writes the moving average of x into out.  It keeps
+    a running sum (one add and one subtract per step) instead of re-summing each window.
+    It matches pandas' rolling(window).mean(): the first window - 1 outputs, and any
+    window containing a NaN, are NaN.  The sum is kept in float64 whatever the dtype of
+    x and out.  With the window baked in, the warm-up is a separate fixed-length loop and
+    the steady-state loop has no index guards.
+
+    Args:
+        window (int): Window length.
+
+    Returns:
+        function: The compiled kernel.
+    """
+    @njit(cache=True, nogil=True, fastmath=FASTMATH)
+    def rolling_mean(x, out):
+        n = x.shape[0]
+        s = 0.0
+        n_nan = 0
+        for i in range(min(window, n)):
+            v = x[i]
+            if np.isnan(v):
+                n_nan += 1
+            else:
+                s += v
+            out[i] = np.nan
+        if n >= window and n_nan == 0:
+            out[window - 1] = s / window
+        for i in range(window, n):
+            v = x[i]
+            if np.isnan(v):
+                n_nan += 1
+            else:
+                s += v
+            old = x[i - window]
+            if np.isnan(old):
+                n_nan -= 1
+            else:
+                s -= old
+            out[i] = s / window if n_nan == 0 else np.nan
+    return rolling_mean
+
+rolling_mean = make_rolling_mean(MA_WINDOW)
+
+@njit(cache=True, nogil=True, fastmath=FASTMATH)
+def window_sums(x, w, sums, nan_counts):
+    """
+    Trailing sums of the non-NaN values of x over w samples, and the number of NaNs in
+    each window.
+
+    Lets a moving average over mean-filled data be finished later: with the fill value m
+    known, the average of a window is (sums[i] + nan_counts[i] * m) / w.  The first w - 1
+    outputs are NaN.
+
+    Args:
+        x (np.ndarray): Input values.
+        w (int): Window length.
+        sums (np.ndarray): Output window sums, same length as x.
+        nan_counts (np.ndarray): Output NaN counts per window, same length as x.
+    """
+    s = 0.0
+    n_nan = 0
+    for i in range(x.shape[0]):
+        v = x[i]
+        if np.isnan(v):
+            n_nan += 1
+        else:
+            s += v
+        if i >= w:
+            old = x[i - w]
+            if np.isnan(old):
+                n_nan -= 1
+            else:
+                s -= old
+        if i >= w - 1:
+            sums[i] = s
+            nan_counts[i] = n_nan
+        else:
+            sums[i] = np.nan
+            nan_counts[i] = np.nan
+
+@njit(cache=True, nogil=True, fastmath=FASTMATH, error_model='numpy')
+def backtest_kernel(close, ma5):
+    """
+    Moving-average strategy backtest on float32 prices.
+
+    The position at step i - 1 is long (1) when ma5 > close and short (-1) otherwise,
+    including the NaN warm-up.  Every step is compared, so ma5 may come from any moving
+    average, not only rolling_mean.  The returns are divided as whole arrays, so a zero
+    price gives an inf or NaN return (as pandas' pct_change does) rather than raising,
+    also in the ahead-of-time build, which cannot set error_model.  Rather than
+    multiplying the return from i - 1 to i by the position, short steps flip the
+    return's sign bit through a uint32 view, so the first loop is branch-free.  The second loop accumulates, in float64, the log growth
+    sum(log1p(r)) and the mean and sample variance of the strategy returns (Welford's
+    update); compounding as a sum of logs rather than a running product cannot
+    overflow or underflow on long series.  The cumulative returns are recovered with
+    one vectorized expm1 over the array at the end.
+
+    Args:
+        close (np.ndarray): Close prices, float32.
+        ma5 (np.ndarray): Moving average of close, float32, same length.
+
+    Returns:
+        tuple: (float32 cumulative returns array, total return, mean return, return variance).
+            Step 0 has no return and is NaN in the cumulative array.
+    """
+    n = close.shape[0]
+    strat = np.empty(n, dtype=np.float32)
+    strat_bits = strat.view(np.uint32)
+    strat[1:] = close[1:] / close[:-1] - np.float32(1.0)
+    for i in range(1, n):
+        # The comparison is False for a NaN moving average, which must go short.
+        short = np.uint32(not ma5[i - 1] > close[i - 1])
+        strat_bits[i] ^= short << np.uint32(31)
+    # cum holds the running log growth until the expm1 pass below.
+    cum = np.empty(n, dtype=np.float32)
+    log_growth = 0.0
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    last_is_nan = True
+    if n > 0:
+        cum[0] = np.nan
+    for i in range(1, n):
+        r = np.float64(strat[i])
+        if np.isnan(r):
+            cum[i] = np.nan
+            last_is_nan = True
+            continue
+        # A loss of 100% or more wipes the account out (log growth -inf) rather than
+        # giving the log of a negative number.
+        log_growth += np.log1p(max(r, -1.0))
+        cum[i] = log_growth
+        last_is_nan = False
+        count += 1
+        delta = r - mean
+        mean += delta / count
+        m2 += delta * (r - mean)
+    cum[:] = np.expm1(cum)
+    total_return = np.nan if last_is_nan else np.expm1(log_growth)
+    var = m2 / (count - 1) if count > 1 else np.nan
+    return cum, total_return, mean, var
+
+def aot_fingerprint():
+    """
+    Fingerprint of the kernels that _kernels_aot.py compiles ahead of time: a hash of
+    MA_WINDOW and of the source of rolling_mean and backtest_kernel.  The build records
+    it, so backtest.py can tell a module built from other sources apart.
+
+    Returns:
+        int: Non-negative integer that fits in an int64.
+    """
+    h = hashlib.sha1(str(MA_WINDOW).encode())
+    for kernel in (rolling_mean, backtest_kernel):
+        h.update(inspect.getsource(kernel.py_func).encode())
+    return int(h.hexdigest()[:15], 16)
+
+# --- Native ports of analysis.R and simulation.m ---
+# Kernels that divide by data-dependent values use error_model='numpy', so a constant
+# column or a zero price gives inf or NaN in that entry (as R and MATLAB do) instead of
+# raising ZeroDivisionError and losing the whole result.
+
+@njit(cache=True, nogil=True)
+def _quantile_sorted(s, q):
+    """Quantile of sorted values with linear interpolation (R's default type 7)."""
+    h = (s.shape[0] - 1) * q
+    lo = int(np.floor(h))
+    if lo + 1 >= s.shape[0]:
+        return s[lo]
+    return s[lo] + (h - lo) * (s[lo + 1] - s[lo])
+
+@njit(parallel=True, cache=True, nogil=True)
+def column_summary(values):
+    """
+    Per-column summary statistics, like R's summary() for numeric columns.
+
+    Args:
+        values (np.ndarray): 2-D array, one column per variable.  NaNs are ignored.
+
+    Returns:
+        np.ndarray: 6 x k array of min, 1st quartile, median, mean, 3rd quartile and max.
+    """
+    k = values.shape[1]
+    out = np.full((6, k), np.nan)
+    for j in prange(k):
+        col = values[:, j]
+        s = np.sort(col[~np.isnan(col)])
+        if s.shape[0] == 0:
+            continue
+        out[0, j] = s[0]
+        out[1, j] = _quantile_sorted(s, 0.25)
+        out[2, j] = _quantile_sorted(s, 0.5)
+        out[3, j] = s.mean()
+        out[4, j] = _quantile_sorted(s, 0.75)
+        out[5, j] = s[-1]
+    return out
+
+@njit(parallel=True, cache=True, nogil=True, error_model='numpy')
+def correlation_matrix(values):
+    """
+    Pearson correlation matrix using pairwise-complete observations, like R's
+    cor(..., use = "pairwise.complete.obs").
+
+    Args:
+        values (np.ndarray): 2-D array, one column per variable.
+
+    Returns:
+        np.ndarray: k x k correlation matrix.
+    """
+    n, k = values.shape
+    out = np.full((k, k), np.nan)
+    for a in prange(k):
+        for b in range(a, k):
+            count = 0
+            sx = 0.0
+            sy = 0.0
+            for i in range(n):
+                x = values[i, a]
+                y = values[i, b]
+                if not (np.isnan(x) or np.isnan(y)):
+                    count += 1
+                    sx += x
+                    sy += y
+            if count < 2:
+                continue
+            mx = sx / count
+            my = sy / count
+            sxx = 0.0
+            syy = 0.0
+            sxy = 0.0
+            for i in range(n):
+                x = values[i, a]
+                y = values[i, b]
+                if not (np.isnan(x) or np.isnan(y)):
+                    sxx += (x - mx) * (x - mx)
+                    syy += (y - my) * (y - my)
+                    sxy += (x - mx) * (y - my)
+            r = sxy / np.sqrt(sxx * syy)
+            out[a, b] = r
+            out[b, a] = r
+    return out
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def linear_regression(x, y):
+    """
+    Ordinary least squares fit of y = b0 + b1 * x, like R's lm(y ~ x).  Rows where
+    either value is NaN are dropped.
+
+    Args:
+        x (np.ndarray): Regressor.
+        y (np.ndarray): Response, same length.
+
+    Returns:
+        tuple: (coefficients [b0, b1], their standard errors, R squared, residual standard error).
+    """
+    count = 0
+    sx = 0.0
+    sy = 0.0
+    for i in range(x.shape[0]):
+        if not (np.isnan(x[i]) or np.isnan(y[i])):
+            count += 1
+            sx += x[i]
+            sy += y[i]
+    coef = np.full(2, np.nan)
+    se = np.full(2, np.nan)
+    if count < 3:
+        return coef, se, np.nan, np.nan
+    mx = sx / count
+    my = sy / count
+    sxx = 0.0
+    syy = 0.0
+    sxy = 0.0
+    for i in range(x.shape[0]):
+        if not (np.isnan(x[i]) or np.isnan(y[i])):
+            sxx += (x[i] - mx) * (x[i] - mx)
+            syy += (y[i] - my) * (y[i] - my)
+            sxy += (x[i] - mx) * (y[i] - my)
+    coef[1] = sxy / sxx
+    coef[0] = my - coef[1] * mx
+    rss = syy - coef[1] * sxy
+    sigma = np.sqrt(rss / (count - 2))
+    se[1] = sigma / np.sqrt(sxx)
+    se[0] = sigma * np.sqrt(1.0 / count + mx * mx / sxx)
+    r_squared = 1.0 - rss / syy
+    return coef, se, r_squared, sigma
+
+@njit(parallel=True, cache=True, nogil=True, error_model='numpy')
+def simulate(close, volume, window):
+    """
+    Moving-average signal simulation from simulation.m.
+
+    The signal is 1 where close is above its centred moving average (MATLAB's movmean,
+    shrinking at the ends), -1 where below and 0 otherwise; it is NaN throughout if the
+    series is shorter than the window.  Step i returns signal[i] * (close[i] - close[i - 1])
+    / close[i], with close[-1] taken as 0, and the returns are compounded.
+
+    Args:
+        close (np.ndarray): Close prices.
+        volume (np.ndarray): Traded volume.
+        window (int): Moving-average window length.
+
+    Returns:
+        tuple: (mean close, std of close, max volume, signal array, cumulative return array).
+    """
+    n = close.shape[0]
+    mean_close = close.mean() if n > 0 else np.nan
+    std_close = np.sqrt(((close - mean_close) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+    max_volume = np.nanmax(volume) if n > 0 else np.nan
+    signal = np.empty(n)
+    if n < window:
+        signal[:] = np.nan
+    else:
+        before = window // 2
+        after = (window - 1) // 2
+        for i in prange(n):
+            lo = max(i - before, 0)
+            hi = min(i + after + 1, n)
+            ma = close[lo:hi].mean()
+            if close[i] > ma:
+                signal[i] = 1.0
+            elif close[i] < ma:
+                signal[i] = -1.0
+            else:
+                signal[i] = 0.0
+    cumulative = np.empty(n)
+    growth = 1.0
+    prev = 0.0
+    for i in range(n):
+        growth *= 1.0 + signal[i] * (close[i] - prev) / close[i]
+        cumulative[i] = growth
+        prev = close[i]
+    return mean_close, std_close, max_volume, signal, cumulative